@@ -0,0 +1,41 @@
+"""Ahead-of-time compile the resistor search kernel with Numba.
+
+Loading the kernel from vdiv_search with Numba costs noticeably more than a
+typical search, so this builds it once into the vdiv_kernel extension module
+next to voltage-divider.py, which imports it in preference to Numba:
+
+    python build_kernel.py
+
+numba.pycc compiles the kernel single-threaded (prange runs as a plain range)
+and without the JIT path's fastmath and boundscheck options. The module is
+stamped with a checksum of vdiv_search.py, and voltage-divider.py ignores a
+build whose stamp no longer matches.
+"""
+import os
+import warnings
+import zlib
+
+from numba.core.errors import NumbaPendingDeprecationWarning
+
+import vdiv_search
+
+with warnings.catch_warnings():
+    # numba.pycc is pending deprecation without a replacement yet, see README.md
+    warnings.simplefilter('ignore', NumbaPendingDeprecationWarning)
+    from numba.pycc import CC
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def main():
+    # Same checksum as _kernel_source_stamp in voltage-divider.py
+    with open(vdiv_search.__file__, 'rb') as f:
+        stamp = zlib.crc32(f.read())
+    cc = CC('vdiv_kernel')
+    cc.output_dir = HERE
+    cc.export('search', vdiv_search.SEARCH_SIGNATURE)(vdiv_search.search_loop)
+    cc.export('source_stamp', 'i8()')(lambda: stamp)
+    cc.compile()
+    print(f"Built {cc.output_file} in {HERE}")
+
+if __name__ == "__main__":
+    main()
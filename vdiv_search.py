@@ -0,0 +1,83 @@
+"""Compiled resistor search kernel for voltage-divider.py.
+
+The kernel lives in this importable module rather than in the script so that
+Numba can cache it on disk: a cached parallel kernel refers back to the module
+that defines it by name, which the hyphenated script run as __main__ does not
+have. build_kernel.py compiles the same function ahead of time.
+"""
+import numpy as np
+from numba import njit, prange
+
+# Same packed score as _search_numpy in voltage-divider.py: the voltage error
+# times this scale plus R1 + R2, so ties go to the smallest total resistance
+SCORE_SCALE = 1e12
+
+# Infinities are used as sentinels and reassociating or approximating the
+# divisions moves exact matches (e.g. R1 == R2 at Vin / 2) by an ulp, so only
+# the fastmath flags that leave the results bit-identical are enabled
+FASTMATH = {'nsz', 'contract', 'afn'}
+SEARCH_SIGNATURE = 'Tuple((f8[::1], f8[::1], f8[::1], f8[::1], i8))(f8, f8, f8[::1], f8)'
+
+def search_loop(vin, vout_desired, resistors, imax):
+    """Evaluate every R1/R2 pair in a compiled double loop.
+
+    Returns the same flat (vout, r1, r2, current) arrays and best index as
+    _search_numpy in voltage-divider.py. Rows are filled in parallel; each
+    pair of outputs is written by exactly one row, and each row keeps its own
+    best candidate, merged afterwards.
+    """
+    n = resistors.size
+    out_vout = np.empty(n * n)
+    out_r1 = np.empty(n * n)
+    out_r2 = np.empty(n * n)
+    out_cur = np.empty(n * n)
+    row_idx = np.full(n, -1)
+    row_score = np.full(n, np.inf)
+    for i in prange(n):
+        r1 = resistors[i]
+        row = i * n
+        # Swapping R1 and R2 keeps the sum and current, so each row only
+        # walks j >= i and also fills the mirrored pair (j, i)
+        for j in range(i, n):
+            k = row + j
+            m = j * n + i
+            r2 = resistors[j]
+            pair_sum = r1 + r2
+            vout = vin * (r2 / pair_sum)
+            # Not vin - vout, which can be an ulp off and move exact matches
+            vout_mirrored = vin * (r1 / pair_sum)
+            current = (vin / pair_sum) * 1000  # Convert to mA (V/kΩ = mA)
+            out_vout[k] = vout
+            out_r1[k] = r1
+            out_r2[k] = r2
+            out_cur[k] = current
+            out_vout[m] = vout_mirrored
+            out_r1[m] = r2
+            out_r2[m] = r1
+            out_cur[m] = current
+            if current > imax:
+                continue  # Skip combinations exceeding imax
+            score = abs(vout - vout_desired) * SCORE_SCALE + pair_sum
+            if score < row_score[i]:
+                row_score[i] = score
+                row_idx[i] = k
+            score = abs(vout_mirrored - vout_desired) * SCORE_SCALE + pair_sum
+            if score < row_score[i]:
+                row_score[i] = score
+                row_idx[i] = m
+
+    best_idx = -1
+    best_score = np.inf
+    for i in range(n):
+        if row_score[i] < best_score:
+            best_score = row_score[i]
+            best_idx = row_idx[i]
+    return out_vout, out_r1, out_r2, out_cur, best_idx
+
+def compile_search():
+    """Compile search_loop as a parallel kernel, reusing Numba's on-disk cache.
+
+    An explicit signature pins the unit-stride layout.
+    """
+    return njit(SEARCH_SIGNATURE, parallel=True, cache=True, fastmath=FASTMATH,
+                boundscheck=False)(search_loop)
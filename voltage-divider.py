@@ -1,17 +1,51 @@
 import configparser
-import itertools
+import importlib.util
+import sys
+import zlib
+from functools import lru_cache
 from math import isclose
 
+import numpy as np
+
+def _kernel_source_stamp():
+    """Checksum of vdiv_search.py, stamped into vdiv_kernel by build_kernel.py."""
+    spec = importlib.util.find_spec('vdiv_search')
+    if spec is None:
+        return None
+    with open(spec.origin, 'rb') as f:
+        return zlib.crc32(f.read())
+
+try:
+    # Ahead-of-time compiled search kernel, see build_kernel.py
+    import vdiv_kernel
+except ImportError:
+    vdiv_kernel = None
+_aot_search = None
+if vdiv_kernel is not None:
+    # A build from an older vdiv_search.py (or without a stamp) is not used
+    stamp = getattr(vdiv_kernel, 'source_stamp', None)
+    if stamp is not None and stamp() == _kernel_source_stamp():
+        _aot_search = vdiv_kernel.search
+    else:
+        print("Warning: vdiv_kernel is out of date, run build_kernel.py again to use it.", file=sys.stderr)
+
+# Numba is optional and only imported once a search is large enough to need it
+HAVE_NUMBA = importlib.util.find_spec('numba') is not None
+
 def read_resistors(file_path):
-    """Read resistor values from resistors.ini file in kilo-ohms."""
+    """Read resistor values from resistors.ini file in kilo-ohms.
+
+    The values are returned as a contiguous float64 array, ready for the
+    search kernels.
+    """
     config = configparser.ConfigParser()
     config.read(file_path)
     try:
-        resistors = [float(x) for x in config['Resistors']['values'].split(',')]
-        return resistors
+        values = config['Resistors']['values']
     except KeyError:
         print("Error: Ensure resistors.ini has a [Resistors] section with 'values' key.")
-        return []
+        return np.empty(0)
+    return np.array([float(x) for x in values.split(',')], dtype=np.float64)
 
 def calculate_vout(vin, r1, r2):
     """Calculate output voltage of a voltage divider."""
@@ -25,73 +59,114 @@ def calculate_power(vin, current):
     """Calculate power consumption in mW."""
     return vin * current / 1000  # Convert current from mA to A for mW
 
-def calculate_required_resistor(vin, vout_desired, known_r, imax, is_r1=True):
-    """Calculate the resistor needed to pair with a known resistor for exact Vout within imax."""
-    if isclose(vout_desired, 0) or isclose(vout_desired, vin):
-        return None  # Impossible to achieve exactly 0V or Vin with finite resistors
-    if is_r1:
-        # R1 is known, solve for R2: Vout = Vin * R2/(R1 + R2)
-        r2 = known_r * vout_desired / (vin - vout_desired)
-    else:
-        # R2 is known, solve for R1: Vout = Vin * R2/(R1 + R2)
-        r1 = known_r * (vin - vout_desired) / vout_desired
-        r2 = known_r
-    # Check if the combination respects imax
-    total_r = known_r + r2 if is_r1 else r1 + known_r
-    current = calculate_current(vin, known_r, r2) if is_r1 else calculate_current(vin, r1, known_r)
-    if current > imax:
-        return None
-    return r2 if is_r1 else r1
+# Closest output voltage wins; ties are broken by the smallest total resistance.
+# Both are packed into one score, error * _SCORE_SCALE + (R1 + R2), so the best
+# pair is found with a single comparison. The scale keeps any realistic total
+# resistance (kΩ) below the resolution of the voltage error.
+_SCORE_SCALE = 1e12
+
+def _search_numpy(vin, vout_desired, resistors, imax):
+    """Evaluate every R1/R2 pair at once as an N x N matrix.
+
+    Returns flat (vout, r1, r2, current) arrays indexed by i * N + j along with
+    the index of the best combination within imax (-1 if there is none).
+    """
+    R1, R2 = np.meshgrid(resistors, resistors, indexing='ij')
+    S = R1 + R2
+    vout = vin * (R2 / S)
+    current = (vin / S) * 1000  # Convert to mA (V/kΩ = mA)
+    mask = current <= imax  # Skip combinations exceeding imax
+    best_idx = -1
+    if mask.any():
+        score = np.where(mask, np.abs(vout - vout_desired) * _SCORE_SCALE + S, np.inf)
+        best_idx = np.argmin(score)
+    return vout.ravel(), R1.ravel(), R2.ravel(), current.ravel(), best_idx
+
+# Loading the parallel Numba kernel from its cache takes about half a second,
+# which the NumPy search only catches up with at a few thousand resistors (where
+# its N x N temporaries also pass a gigabyte), so shorter lists skip Numba
+_NUMBA_MIN_RESISTORS = 4000
 
-def find_best_resistors(vin, vout_desired, resistors, imax):
-    """Find the best R1 and R2 combination from available resistors within imax."""
+_search_jit = None
+
+def _search_compiled(vin, vout_desired, resistors, imax):
+    """Run the parallel Numba kernel from vdiv_search, compiling it on first use."""
+    global _search_jit
+    if _search_jit is None:
+        from vdiv_search import compile_search
+        _search_jit = compile_search()
+    return _search_jit(vin, vout_desired, resistors, imax)
+
+def _search(vin, vout_desired, resistors, imax):
+    """Search with the fastest implementation available for this many resistors.
+
+    The ahead-of-time kernel is single-threaded (numba.pycc cannot compile
+    prange in parallel) but starts instantly, so it is used whenever built.
+    """
+    if _aot_search is not None:
+        return _aot_search(vin, vout_desired, resistors, imax)
+    if HAVE_NUMBA and resistors.size >= _NUMBA_MIN_RESISTORS:
+        return _search_compiled(vin, vout_desired, resistors, imax)
+    return _search_numpy(vin, vout_desired, resistors, imax)
+
+@lru_cache(maxsize=8)
+def _cached_search(vin, vout_desired, resistors_key, imax):
+    """Memoized _search, keyed on the resistor values as a tuple.
+
+    The buffers are shared between callers, so they are returned read-only.
+    """
+    results = _search(vin, vout_desired, np.array(resistors_key, dtype=np.float64), imax)
+    for buf in results[:4]:
+        buf.flags.writeable = False
+    return results
+
+def find_best_resistors(vin, vout_desired, resistors, imax=float('inf')):
+    """Find the best R1 and R2 combination from available resistors within imax.
+
+    The achievable voltages are returned as the search's struct of arrays
+    (vout, r1, r2, current) with one slot per R1/R2 pair, including pairs
+    exceeding imax, so callers must filter on current themselves.
+    """
     if vin > 3.3:
         print("Warning: Input voltage exceeds 3.3V, which is unsafe for ESP32-C3 ADC.")
     
+    vout, r1, r2, current, best_idx = _cached_search(vin, vout_desired, tuple(resistors), imax)
+    
     best_r1, best_r2 = None, None
     best_vout = None
     best_current = None
-    min_error = float('inf')
-    achievable_voltages = []
-    
-    # Try all combinations of resistors for R1 and R2
-    for r1, r2 in itertools.product(resistors, repeat=2):
-        vout = calculate_vout(vin, r1, r2)
-        current = calculate_current(vin, r1, r2)
-        if current > imax:
-            continue  # Skip combinations exceeding imax
-        error = abs(vout - vout_desired)
-        achievable_voltages.append((vout, r1, r2, error, current))
-        
-        # Update if this combination gives a closer output voltage
-        if error < min_error or (isclose(error, min_error, rel_tol=1e-9) and (r1 + r2) < (best_r1 + best_r2 if best_r1 and best_r2 else float('inf'))):
-            min_error = error
-            best_r1, best_r2 = r1, r2
-            best_vout = vout
-            best_current = current
+    if best_idx >= 0:
+        best_r1, best_r2 = r1[best_idx], r2[best_idx]
+        best_vout = vout[best_idx]
+        best_current = current[best_idx]
     
-    return best_r1, best_r2, best_vout, best_current, achievable_voltages
-
-def suggest_resistors(vin, vout_desired, resistors, imax):
-    """Suggest resistors to pair with existing ones for exact Vout within imax."""
-    suggestions = []
-    for r in resistors:
-        # Case 1: Known R1, find R2
-        r2 = calculate_required_resistor(vin, vout_desired, r, imax, is_r1=True)
-        if r2 and r2 > 0:
-            suggestions.append((r, r2, "R1", "R2"))
-        # Case 2: Known R2, find R1
-        r1 = calculate_required_resistor(vin, vout_desired, r, imax, is_r1=False)
-        if r1 and r1 > 0:
-            suggestions.append((r1, r, "R1", "R2"))
-    return suggestions
+    return best_r1, best_r2, best_vout, best_current, (vout, r1, r2, current)
+
+def suggest_resistors(vin, vout_desired, resistors, imax=float('inf')):
+    """Suggest resistors to pair with existing ones for exact Vout within imax.
+
+    Returns an array of (R1, R2) rows: for each available resistor, first the
+    pair using it as R1, then the pair using it as R2.
+    """
+    if isclose(vout_desired, 0) or isclose(vout_desired, vin):
+        return np.empty((0, 2))  # Impossible to achieve exactly 0V or Vin with finite resistors
+    # Case 1: Known R1, solve for R2: Vout = Vin * R2/(R1 + R2)
+    r2_needed = resistors * vout_desired / (vin - vout_desired)
+    # Case 2: Known R2, solve for R1: Vout = Vin * R2/(R1 + R2)
+    r1_needed = resistors * (vin - vout_desired) / vout_desired
+    suggestions = np.stack((np.column_stack((resistors, r2_needed)),
+                            np.column_stack((r1_needed, resistors))), axis=1).reshape(-1, 2)
+    # Check if each combination respects imax
+    current = calculate_current(vin, suggestions[:, 0], suggestions[:, 1])
+    valid = (current <= imax) & (suggestions > 0).all(axis=1)
+    return suggestions[valid]
 
 def main():
     # Get user input
     try:
         vin = float(input("Enter input voltage (V): "))
         vout_desired = float(input("Enter desired output voltage (V): "))
-        imax = float(input("Enter maximum allowed current (mA): "))
+        imax = float(input("Enter maximum allowed current (mA, blank for no limit): ") or 'inf')
     except ValueError:
         print("Error: Please enter valid numerical values for voltages and current.")
         return
@@ -108,7 +183,7 @@ def main():
     
     # Read resistors from file
     resistors = read_resistors('resistors.ini')
-    if not resistors:
+    if resistors.size == 0:
         print("Error: No valid resistors found in resistors.ini.")
         return
     
@@ -130,24 +205,34 @@ def main():
     # Suggest resistors to achieve exact Vout
     print("\n=== Suggested Resistors for Exact Output ===")
     suggestions = suggest_resistors(vin, vout_desired, resistors, imax)
-    if not suggestions:
+    if len(suggestions) == 0:
         print("No valid resistor suggestions within the current limit.")
     else:
-        for r1_val, r2_val, r1_label, r2_label in suggestions:
-            current_suggestion = calculate_current(vin, r1_val, r2_val) if r1_label == "R1" else calculate_current(vin, r1_val, r2_val)
-            print(f"Use {r1_label} = {r1_val:.3f} kΩ with {r2_label} = {r2_val:.3f} kΩ "
-                  f"(you have {r2_val if r2_label == 'R2' else r1_val} kΩ, current: {current_suggestion:.3f} mA)")
+        currents = calculate_current(vin, suggestions[:, 0], suggestions[:, 1])
+        rows = [f"Use R1 = {r1_val:.3f} kΩ with R2 = {r2_val:.3f} kΩ "
+                f"(you have {r2_val} kΩ, current: {current_suggestion:.3f} mA)"
+                for (r1_val, r2_val), current_suggestion in zip(suggestions, currents)]
+        sys.stdout.write('\n'.join(rows) + '\n')  # One write instead of a print per row
     
     # List achievable voltages
     print("\n=== Achievable Output Voltages with Current Resistors ===")
-    # Filter voltages <= vout_desired and sort in descending order
-    filtered_voltages = [v for v in achievable_voltages if v[0] <= vout_desired]
-    filtered_voltages.sort(key=lambda x: (-x[0], x[1] + x[2]))
-    for vout, r1, r2, _, current in filtered_voltages[:15]:  # Show top 15
-        print(f"Vout: {vout:.3f} V (R1: {r1} kΩ, R2: {r2} kΩ, Current: {current:.3f} mA)")
-    if len(filtered_voltages) > 15:
-        print(f"... and {len(filtered_voltages) - 15} more combinations.")
-    elif len(filtered_voltages) == 0:
+    # Filter voltages <= vout_desired within imax and sort the top 15 in descending order
+    vouts, r1s, r2s, currents = achievable_voltages
+    below = np.flatnonzero((vouts <= vout_desired) & (currents <= imax))
+    top = below
+    if len(below) > 15:
+        # Partial selection instead of sorting every combination; everything
+        # tied with the 15th voltage is kept so the tiebreak on R1 + R2 holds
+        score = -vouts[below]
+        top = below[score <= np.partition(score, 14)[14]]
+    order = top[np.lexsort((r1s[top] + r2s[top], -vouts[top]))]
+    rows = [f"Vout: {vouts[k]:.3f} V (R1: {r1s[k]} kΩ, R2: {r2s[k]} kΩ, Current: {currents[k]:.3f} mA)"
+            for k in order[:15]]  # Show top 15
+    if rows:
+        sys.stdout.write('\n'.join(rows) + '\n')
+    if len(below) > 15:
+        print(f"... and {len(below) - 15} more combinations.")
+    elif len(below) == 0:
         print("No achievable voltages less than or equal to the desired output voltage within the current limit.")
 
 if __name__ == "__main__":